@@ -6,37 +6,61 @@ from PIL import Image, ImageDraw, ImageFont
 import io
 import textwrap
 import re
-import spacy
-import json
 import random
-from Utilities.diet_extractor import extract_text as util_extract_text
-from Utilities.diet_generator import generate_diet as util_generate_diet
-def safe_predict_condition(numeric_data):
-    try:
-        import pandas as pd
-        from joblib import load
-        from pathlib import Path
-        model_path = Path(__file__).resolve().parent / "ML_model" / "ML_model.pkl"
-        model = load(str(model_path))
-        features = ["age", "glucose", "cholesterol", "blood_pressure", "bmi"]
-        X = pd.DataFrame([[numeric_data[f] for f in features]], columns=features)
-        pred = model.predict(X)[0]
-        return "Abnormal" if int(pred) == 1 else "Normal"
-    except Exception:
-        gl = numeric_data.get("glucose")
-        chol = numeric_data.get("cholesterol")
-        bp = numeric_data.get("blood_pressure")
-        bmi = numeric_data.get("bmi")
-        flags = 0
-        if gl is not None and gl >= 126:
-            flags += 1
-        if chol is not None and chol >= 240:
-            flags += 1
-        if bp is not None and bp >= 140:
-            flags += 1
-        if bmi is not None and bmi >= 30:
-            flags += 1
-        return "Abnormal" if flags >= 1 else "Normal"
+from pathlib import Path
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.logger import get_logger
+from Utilities.csv_cache import load_cohort
+from Utilities.pipeline import run_pipeline
+from Utilities.plan_exports import plan_csv, plan_ics, plan_json
+from Utilities.deadline_predictor import DeadlinePredictor
+from Utilities.prediction_cache import PredictionCache
+from Utilities.preload import get_model, get_nlp
+from Utilities.report_renderer import render_report
+MODEL_PATH = Path(__file__).resolve().parent / "ML_model" / "ML_model.pkl"
+PREDICTION_BUDGET_S = 0.5
+
+logger = get_logger(__name__)
+
+@st.cache_resource
+def load_prediction_cache():
+    return PredictionCache(MODEL_PATH)
+
+def model_predict_condition(numeric_data):
+    model = get_model(MODEL_PATH)
+    features = ["age", "glucose", "cholesterol", "blood_pressure", "bmi"]
+    X = pd.DataFrame([[numeric_data[f] for f in features]], columns=features)
+    pred = model.predict(X)[0]
+    return "Abnormal" if int(pred) == 1 else "Normal"
+
+def rule_predict_condition(numeric_data):
+    gl = numeric_data.get("glucose")
+    chol = numeric_data.get("cholesterol")
+    bp = numeric_data.get("blood_pressure")
+    bmi = numeric_data.get("bmi")
+    flags = 0
+    if gl is not None and gl >= 126:
+        flags += 1
+    if chol is not None and chol >= 240:
+        flags += 1
+    if bp is not None and bp >= 140:
+        flags += 1
+    if bmi is not None and bmi >= 30:
+        flags += 1
+    return "Abnormal" if flags >= 1 else "Normal"
+
+@st.cache_resource
+def load_deadline_predictor():
+    # Load (and unpickle LightGBM) once here, outside the latency budget, so a
+    # cold process doesn't time its first predictions out to the rules.
+    get_model(MODEL_PATH)
+    cache = load_prediction_cache()
+    return DeadlinePredictor(
+        lambda d: cache.get_or_compute(d, model_predict_condition),
+        rule_predict_condition,
+        budget=PREDICTION_BUDGET_S,
+    )
 
 # -------------------- PAGE CONFIG --------------------
 st.set_page_config(
@@ -148,9 +172,7 @@ st.markdown("""
 # -------------------- LOAD NLP SAFELY --------------------
 @st.cache_resource
 def load_spacy():
-    nlp = spacy.blank("en")
-    nlp.add_pipe("sentencizer")
-    return nlp
+    return get_nlp()
 
 nlp = load_spacy()
 
@@ -180,7 +202,7 @@ def extract_text(uploaded_file):
         text = uploaded_file.read().decode("utf-8")
 
     elif ext == "csv":
-        df = pd.read_csv(uploaded_file)
+        df = load_cohort(uploaded_file)
         if "doctor_prescription" in df.columns:
             text = df["doctor_prescription"].iloc[0]
         else:
@@ -586,6 +608,36 @@ def meal_plan_pdf(plan):
     buf = io.BytesIO()
     pages[0].save(buf, format="PDF", save_all=True, append_images=pages[1:])
     return buf.getvalue()
+EXPORT_FORMATS = {
+    "JSON": ("diet_plan.json", "application/json"),
+    "PDF": ("meal_plan.pdf", "application/pdf"),
+    "CSV": ("meal_plan.csv", "text/csv"),
+    "iCalendar": ("meal_plan.ics", "text/calendar"),
+}
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def build_export(fmt, diet, plan, start):
+    if fmt == "JSON":
+        return plan_json(diet, plan)
+    if fmt == "PDF":
+        return meal_plan_pdf(plan)
+    if fmt == "CSV":
+        return plan_csv(plan)
+    return plan_ics(plan, start)
+STAGE_LABELS = {
+    "extraction": "reports read",
+    "diet": "diet rules applied",
+    "meal_plan": "meal plan ready",
+    "prediction": "risk scored",
+}
+
+@st.cache_resource
+def load_pipeline_executor():
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="pipeline")
+def input_key(files, *values):
+    # Identifies the inputs a result was generated from, so a stored result is
+    # only shown while the form still matches it.
+    return tuple((f.name, f.size, getattr(f, "file_id", None)) for f in files or []) + values
 def has_required_numeric_data(d):
     req = ["age", "glucose", "cholesterol", "blood_pressure", "bmi"]
     return d is not None and all(k in d and d[k] is not None for k in req)
@@ -599,10 +651,11 @@ with input_container:
     
     with col1:
         st.markdown("### � Upload Medical Report")
-        st.info("Supported formats: PDF, JPG, PNG, TXT, CSV")
-        uploaded_file = st.file_uploader(
-            "Upload your file here",
+        st.info("Supported formats: PDF, JPG, PNG, TXT, CSV. You can upload several files at once.")
+        uploaded_files = st.file_uploader(
+            "Upload your files here",
             type=["pdf", "png", "jpg", "jpeg", "txt", "csv"],
+            accept_multiple_files=True,
             label_visibility="collapsed"
         )
         
@@ -627,6 +680,15 @@ with input_container:
             glucose = st.number_input("Glucose (mg/dL)", min_value=50.0, max_value=300.0, value=100.0, step=1.0)
         with c7:
             diet_type = st.selectbox("Diet Type", ["Vegetarian", "Non-Vegetarian", "Vegan"])
+
+        c8, c9 = st.columns(2)
+        with c8:
+            age = st.number_input("Age", min_value=1, max_value=120, value=None, step=1)
+        with c9:
+            blood_pressure = st.number_input("Blood Pressure (systolic, mmHg)", min_value=70.0, max_value=250.0, value=None, step=1.0)
+        # Off by default so untouched form defaults are never scored as if
+        # they were measurements.
+        score_manual = st.checkbox("Use these measured values for the ML risk assessment")
             
         intolerances = st.multiselect("Intolerances", ["Lactose", "Gluten", "Nuts", "Soy", "Eggs", "Shellfish"])
         
@@ -635,122 +697,108 @@ with input_container:
 
 st.markdown("<br>", unsafe_allow_html=True)
 process_btn = st.button("✨ Generate Personalized Diet Plan")
+current_key = input_key(
+    uploaded_files, manual_text, diabetes, total_cholesterol, diet_type,
+    score_manual, glucose, bmi, age, blood_pressure
+)
 
 # -------------------- PIPELINE EXECUTION --------------------
 if process_btn:
     with st.spinner("🔄 Analyzing your health profile..."):
-        if uploaded_file:
-            text, numeric_data = util_extract_text(uploaded_file)
-        else:
-            text = manual_text.strip()
-            numeric_data = None
+        predictor = load_deadline_predictor()
+        status = st.empty()
+
+        def predict(numeric_data):
+            if not has_required_numeric_data(numeric_data):
+                return None
+            return predictor.predict(numeric_data)
+
+        def show_progress(completed, elapsed):
+            # Touching the UI also lets Streamlit abort this run if the
+            # inputs change, which cancels the remaining stages.
+            done = ", ".join(STAGE_LABELS[s] for s in completed) or "starting"
+            status.caption(f"⏱️ {elapsed:.1f}s · {done}")
+
+        out = run_pipeline(
+            {
+                "files": uploaded_files,
+                "manual_text": manual_text,
+                "manual_numeric": {
+                    "age": age,
+                    "glucose": glucose,
+                    "cholesterol": total_cholesterol,
+                    "blood_pressure": blood_pressure,
+                    "bmi": bmi,
+                } if score_manual else {},
+                "diabetes": diabetes,
+                "total_cholesterol": total_cholesterol,
+                "diet_type": diet_type,
+            },
+            predict,
+            generate_meal_plan,
+            executor=load_pipeline_executor(),
+            on_progress=show_progress,
+        )
+        status.empty()
+        # Operator-facing counters for the cache and the deadline/fallback path.
+        logger.info(
+            "prediction cache: %s; deadline predictor: %s",
+            load_prediction_cache().stats(),
+            predictor.stats(),
+        )
+
+        for name, error in out["errors"]:
+            st.warning(f"⚠️ Could not read {name}: {error}")
 
-        tokens = []
-        if diabetes != "No":
-            tokens.append("diabetes")
-        if total_cholesterol >= 200:
-            tokens.append("cholesterol")
-        if text.strip() == "" and tokens:
-            text = " ".join(tokens)
+        text = out["text"]
+        diet = out["diet"]
+        mp = out["meal_plan"]
+        ml_pred = None
+        ml_source = None
+        if out["prediction"]:
+            ml_pred = out["prediction"]["prediction"]
+            ml_source = "ML model" if out["prediction"]["source"] == "model" else "rule-based fallback"
 
         # Show extracted text preview in a cleaner way
         with st.expander("📝 View Extracted Text", expanded=False):
             st.write(text[:1000] if text else "No text extracted.")
 
-        diet = util_generate_diet(text)
-        ml_pred = None
-        if has_required_numeric_data(numeric_data):
-            ml_pred = safe_predict_condition(numeric_data)
+    # Kept in the session so results survive the reruns triggered by the
+    # download controls below, tagged with the inputs they came from. The
+    # report HTML is rendered once here; reruns resend the stored string.
+    st.session_state["result"] = {
+        "key": current_key,
+        "diet": diet,
+        "meal_plan": mp,
+        "html": render_report(diet, mp, ml_pred, ml_source),
+    }
 
-    # Results Display
-    st.markdown("---")
-    st.markdown("## 🥗 Your Personalized Nutrition Plan")
-    
-    # Condition & Prediction Row
-    st.markdown(f"""
-    <div class="result-card">
-        <h3>🩺 Health Analysis</h3>
-        <p><strong>Detected Condition:</strong> <span style="color: #e74c3c; font-weight: bold;">{diet['condition']}</span></p>
-        {f'<p><strong>ML Risk Assessment:</strong> <span style="color: #e67e22; font-weight: bold;">{ml_pred}</span></p>' if ml_pred else ''}
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Foods Row
-    c_allow, c_restrict = st.columns(2)
-    with c_allow:
-        items = "".join([f"<li>{x}</li>" for x in diet["allowed_foods"]])
-        st.markdown(f"""
-        <div class="result-card" style="border-left: 5px solid #2ecc71;">
-            <h3 style="color: #2ecc71;">✅ Foods to Include</h3>
-            <ul style="padding-left: 20px;">{items}</ul>
-        </div>
-        """, unsafe_allow_html=True)
-        
-    with c_restrict:
-        items = "".join([f"<li>{x}</li>" for x in diet["restricted_foods"]])
-        st.markdown(f"""
-        <div class="result-card" style="border-left: 5px solid #e74c3c;">
-            <h3 style="color: #e74c3c;">❌ Foods to Avoid</h3>
-            <ul style="padding-left: 20px;">{items}</ul>
-        </div>
-        """, unsafe_allow_html=True)
-
-    # Advice
-    st.markdown(f"""
-    <div class="result-card" style="border-left: 5px solid #3498db;">
-        <h3 style="color: #3498db;">💡 Lifestyle & Diet Advice</h3>
-        <p><strong>Diet Strategy:</strong> {diet['diet_plan']}</p>
-        <p><strong>Daily Habits:</strong> {diet['lifestyle_advice']}</p>
-    </div>
-    """, unsafe_allow_html=True)
-
-    # Meal Plan
-    cond_text = diet["condition"].lower()
-    has_d = ("diabetes" in cond_text) or (diabetes != "No")
-    has_c = ("cholesterol" in cond_text) or (total_cholesterol >= 200)
-    mp = generate_meal_plan(has_d, has_c, diet_type)
-    
-    st.markdown("## 📅 7-Day Meal Schedule")
-    
-    for idx, day in enumerate(mp, start=1):
-        st.markdown(f"""
-        <div class="result-card" style="border-left: 5px solid #FF416C; margin-bottom: 20px;">
-            <h4 style="color: #2c3e50; margin-bottom: 1rem;">📅 Day {idx}</h4>
-            <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem;">
-                <div style="background: #f8f9fa; padding: 10px; border-radius: 8px;">
-                    <strong>🍳 Breakfast</strong><br>
-                    <span style="color: #555;">{day['breakfast']}</span>
-                </div>
-                <div style="background: #f8f9fa; padding: 10px; border-radius: 8px;">
-                    <strong>🍱 Lunch</strong><br>
-                    <span style="color: #555;">{day['lunch']}</span>
-                </div>
-                <div style="background: #f8f9fa; padding: 10px; border-radius: 8px;">
-                    <strong>🍎 Snack</strong><br>
-                    <span style="color: #555;">{day['snack']}</span>
-                </div>
-                <div style="background: #f8f9fa; padding: 10px; border-radius: 8px;">
-                    <strong>🍽️ Dinner</strong><br>
-                    <span style="color: #555;">{day['dinner']}</span>
-                </div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-    # Downloads
+result = st.session_state.get("result")
+if result and result["key"] != current_key:
+    # Inputs changed since this plan was generated; drop it rather than show
+    # or export a plan that no longer matches the form.
+    del st.session_state["result"]
+    result = None
+if result:
+    diet = result["diet"]
+    mp = result["meal_plan"]
+
+    # Results Display: analysis, food lists, advice and the full week go
+    # out as one escaped HTML block in a single delta.
+    st.markdown(result["html"], unsafe_allow_html=True)
+
+    # Downloads: nothing is serialized or rasterized until a format is requested.
     st.markdown("### 📥 Download Your Plan")
-    d1, d2 = st.columns(2)
+    d1, d2 = st.columns([2, 1])
     with d1:
-        st.download_button(
-            label="📄 Download JSON",
-            data=json.dumps({"diet": diet, "weekly_meal_plan": mp}, indent=2),
-            file_name="diet_plan.json",
-            mime="application/json"
-        )
+        export_fmt = st.selectbox("Format", list(EXPORT_FORMATS), label_visibility="collapsed")
     with d2:
+        prepare = st.button("⚙️ Prepare Download")
+    if prepare:
+        file_name, mime = EXPORT_FORMATS[export_fmt]
         st.download_button(
-            label="📑 Download PDF",
-            data=meal_plan_pdf(mp),
-            file_name="meal_plan.pdf",
-            mime="application/pdf"
+            label=f"📥 Download {export_fmt}",
+            data=build_export(export_fmt, diet, mp, date.today()),
+            file_name=file_name,
+            mime=mime
         )
@@ -0,0 +1,114 @@
+import hashlib
+import io
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+FEATURES = ["age", "glucose", "cholesterol", "blood_pressure", "bmi"]
+COLUMNS = ["doctor_prescription"] + FEATURES
+DTYPES = {"doctor_prescription": "string", **{f: "float32" for f in FEATURES}}
+
+# Cached files hold patient data, so they are kept only for a short time and
+# within a size cap. Set MYDIET_CSV_CACHE_DIR to an empty string to disable
+# the cache entirely.
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "csv"
+CACHE_DIR = os.environ.get("MYDIET_CSV_CACHE_DIR", str(DEFAULT_CACHE_DIR))
+CACHE_MAX_AGE_S = float(os.environ.get("MYDIET_CSV_CACHE_MAX_AGE_S", 24 * 3600))
+CACHE_MAX_BYTES = int(os.environ.get("MYDIET_CSV_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+
+def read_bytes(source):
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    if hasattr(source, "read"):
+        return source.read()
+    return Path(source).read_bytes()
+
+
+def parse_csv(data):
+    # Only the prescription and the model features are ever used downstream.
+    return pd.read_csv(
+        io.BytesIO(data),
+        usecols=lambda c: c in COLUMNS,
+        dtype=DTYPES,
+        engine="c",
+    )
+
+
+def prune_cache(cache_dir):
+    # Drop expired entries (and temp files left by crashed writers), then the
+    # least recently used entries until the directory fits the size cap.
+    # mtime is the write time and is never touched again, so an entry expires
+    # however often it is read; hits only bump atime, which orders the LRU.
+    now = time.time()
+    entries = []
+    for path in cache_dir.glob("*"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        if now - stat.st_mtime > CACHE_MAX_AGE_S:
+            path.unlink(missing_ok=True)
+        elif path.suffix == ".arrow":
+            entries.append((stat.st_atime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= CACHE_MAX_BYTES:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def write_cache(path, df):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        # Uncompressed Arrow IPC so later reads can memory-map the file.
+        feather.write_feather(df, tmp, compression="uncompressed")
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def read_cache(path):
+    table = feather.read_table(str(path), memory_map=True)
+    # Null-free numeric columns come back as read-only views on the mapped
+    # file; the prescription column and columns with missing values are copied.
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def load_cohort(source):
+    data = read_bytes(source)
+    if feather is None or not CACHE_DIR:
+        return parse_csv(data)
+
+    cache_dir = Path(CACHE_DIR)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    prune_cache(cache_dir)
+
+    path = cache_dir / (hashlib.sha256(data).hexdigest() + ".arrow")
+    try:
+        df = read_cache(path)
+        stat = path.stat()
+        os.utime(path, (time.time(), stat.st_mtime))
+        return df
+    except Exception:
+        # Missing, pruned by another process, or unreadable: re-parse.
+        pass
+
+    df = parse_csv(data)
+    try:
+        write_cache(path, df)
+    except OSError:
+        pass
+    return df
@@ -0,0 +1,95 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+
+class DeadlinePredictor:
+    def __init__(self, model_fn, fallback_fn, budget=0.5, failure_threshold=3, cooldown=30.0, max_workers=2):
+        self.model_fn = model_fn
+        self.fallback_fn = fallback_fn
+        self.budget = budget
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-predict")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self.counters = {
+            "model": 0,
+            "rules": 0,
+            "timeout": 0,
+            "error": 0,
+            "circuit_open": 0,
+            "saturated": 0,
+        }
+
+    def _state(self, now):
+        if self._consecutive_failures < self.failure_threshold:
+            return "closed"
+        return "open" if now < self._open_until else "half_open"
+
+    def _record(self, source, reason=None):
+        with self._lock:
+            self.counters[source] += 1
+            if reason:
+                self.counters[reason] += 1
+            if source == "model":
+                self._consecutive_failures = 0
+            elif reason in ("timeout", "error"):
+                self._consecutive_failures += 1
+                if self._consecutive_failures >= self.failure_threshold:
+                    self._open_until = time.monotonic() + self.cooldown
+
+    def _fallback(self, numeric_data, reason, started):
+        self._record("rules", reason)
+        return {
+            "prediction": self.fallback_fn(numeric_data),
+            "source": "rules",
+            "reason": reason,
+            "elapsed": time.monotonic() - started,
+        }
+
+    def _release(self, future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def predict(self, numeric_data):
+        started = time.monotonic()
+        with self._lock:
+            state = self._state(started)
+            # Timed-out calls keep running and hold their threads. Submitting
+            # behind them would spend the budget queueing, so answer with the
+            # rules until a thread frees up. This also keeps a half-open trial
+            # from failing because of stale calls ahead of it.
+            saturated = state != "open" and self._in_flight >= self.max_workers
+            if state != "open" and not saturated:
+                self._in_flight += 1
+        if state == "open":
+            return self._fallback(numeric_data, "circuit_open", started)
+        if saturated:
+            return self._fallback(numeric_data, "saturated", started)
+
+        # A timed-out call's result is simply discarded (or lands in whatever
+        # cache model_fn writes to).
+        future = self._executor.submit(self.model_fn, numeric_data)
+        future.add_done_callback(self._release)
+        try:
+            prediction = future.result(timeout=self.budget)
+        except TimeoutError:
+            return self._fallback(numeric_data, "timeout", started)
+        except Exception:
+            return self._fallback(numeric_data, "error", started)
+
+        self._record("model")
+        return {
+            "prediction": prediction,
+            "source": "model",
+            "reason": None,
+            "elapsed": time.monotonic() - started,
+        }
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, circuit=self._state(time.monotonic()))
@@ -3,6 +3,8 @@ import pytesseract
 from PIL import Image
 import pandas as pd
 
+from Utilities.csv_cache import load_cohort
+
 def extract_text(uploaded_file):
     text = ""
     numeric_data = None
@@ -21,9 +23,12 @@ def extract_text(uploaded_file):
         text = uploaded_file.read().decode("utf-8")
 
     elif file_type == "csv":
-        df = pd.read_csv(uploaded_file)
-        text = df["doctor_prescription"].iloc[0]
-        numeric_data = df.iloc[0].to_dict()
+        df = load_cohort(uploaded_file)
+        # Device exports often carry only vitals: no prescription column, or
+        # an empty cell. The numeric features are still returned.
+        if "doctor_prescription" in df.columns and not pd.isna(df["doctor_prescription"].iloc[0]):
+            text = str(df["doctor_prescription"].iloc[0])
+        numeric_data = df.drop(columns="doctor_prescription", errors="ignore").iloc[0].to_dict()
 
     return text, numeric_data
 
@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from Utilities.diet_extractor import extract_text
+
+# Lower rank wins when several files provide the same numeric field: device
+# CSVs are structured, typed text next, then PDF text, then OCR output.
+# Files of the same type keep their upload order.
+SOURCE_PRIORITY = {"csv": 0, "txt": 1, "pdf": 2, "png": 3, "jpg": 3, "jpeg": 3}
+
+def file_type(uploaded_file):
+    return uploaded_file.name.split(".")[-1].lower()
+
+def extract_file(uploaded_file):
+    # A file that fails to extract contributes nothing instead of failing the
+    # whole merge; the error is kept so the caller can report it.
+    try:
+        text, numeric_data = extract_text(uploaded_file)
+        error = None
+    except Exception as exc:
+        text, numeric_data, error = "", None, f"{type(exc).__name__}: {exc}"
+    return {
+        "name": uploaded_file.name,
+        "type": file_type(uploaded_file),
+        "text": text if isinstance(text, str) else "",
+        "numeric_data": numeric_data,
+        "error": error,
+    }
+
+def merge_extractions(results):
+    ranked = sorted(
+        enumerate(results),
+        key=lambda r: (SOURCE_PRIORITY.get(r[1]["type"], len(SOURCE_PRIORITY)), r[0]),
+    )
+    # Text from every file is kept, highest-priority source first, so the
+    # keyword rules in generate_diet see all of it.
+    text = "\n\n".join(r["text"].strip() for _, r in ranked if r["text"].strip())
+
+    numeric_data = None
+    for _, r in ranked:
+        for key, value in (r["numeric_data"] or {}).items():
+            if pd.isna(value):
+                continue
+            if numeric_data is None:
+                numeric_data = {}
+            numeric_data.setdefault(key, value)
+
+    errors = [(r["name"], r["error"]) for r in results if r.get("error")]
+    return text, numeric_data, errors
+
+def extract_many(uploaded_files, max_workers=8):
+    if not uploaded_files:
+        return "", None, []
+    if len(uploaded_files) == 1:
+        return merge_extractions([extract_file(uploaded_files[0])])
+    # OCR runs in a tesseract subprocess and pdfplumber/pandas release the
+    # GIL for much of their I/O, so threads are enough to overlap files.
+    with ThreadPoolExecutor(max_workers=min(len(uploaded_files), max_workers)) as pool:
+        results = list(pool.map(extract_file, uploaded_files))
+    return merge_extractions(results)
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+from Utilities.diet_generator import generate_diet
+from Utilities.multi_extractor import extract_many
+
+
+def condition_flags(diabetes, total_cholesterol, condition=""):
+    condition = condition.lower()
+    return (
+        diabetes != "No" or "diabetes" in condition,
+        total_cholesterol >= 200 or "cholesterol" in condition,
+    )
+
+
+async def _pipeline(inputs, predict, plan_meals, executor, report):
+    loop = asyncio.get_running_loop()
+
+    def run(fn, *args):
+        return loop.run_in_executor(executor, fn, *args)
+
+    # The manual form alone decides the meal-plan group in most runs, so that
+    # plan starts right away instead of waiting for the uploads.
+    manual_flags = condition_flags(inputs["diabetes"], inputs["total_cholesterol"])
+    speculative_plan = run(plan_meals, *manual_flags, inputs["diet_type"])
+
+    # manual_numeric is empty unless the user opted in to scoring the form.
+    # Without uploads it is the only input, so scoring starts immediately.
+    manual_numeric = inputs["manual_numeric"]
+    files = inputs["files"]
+    if not files:
+        prediction = run(predict, manual_numeric)
+
+    if files:
+        text, numeric_data, errors = await run(extract_many, files)
+    else:
+        text, numeric_data, errors = inputs["manual_text"].strip(), None, []
+    report("extraction")
+
+    tokens = []
+    if manual_flags[0]:
+        tokens.append("diabetes")
+    if manual_flags[1]:
+        tokens.append("cholesterol")
+    if text.strip() == "" and tokens:
+        text = " ".join(tokens)
+
+    if files:
+        # Measured values from the uploads take precedence over opted-in form
+        # values; anything neither provides stays missing and is not scored.
+        scored = dict(manual_numeric)
+        scored.update(numeric_data or {})
+        prediction = run(predict, scored)
+    diet = generate_diet(text)
+    report("diet")
+
+    flags = condition_flags(inputs["diabetes"], inputs["total_cholesterol"], diet["condition"])
+    if flags == manual_flags:
+        meal_plan = await speculative_plan
+    else:
+        speculative_plan.cancel()
+        meal_plan = await run(plan_meals, *flags, inputs["diet_type"])
+    report("meal_plan")
+
+    prediction = await prediction
+    report("prediction")
+
+    return {
+        "text": text,
+        "numeric_data": numeric_data,
+        "errors": errors,
+        "diet": diet,
+        "meal_plan": meal_plan,
+        "prediction": prediction,
+    }
+
+
+async def _supervise(inputs, predict, plan_meals, executor, on_progress, poll_interval):
+    completed = []
+    main = asyncio.ensure_future(_pipeline(inputs, predict, plan_meals, executor, completed.append))
+    started = time.monotonic()
+    try:
+        while True:
+            done, _ = await asyncio.wait({main}, timeout=poll_interval)
+            # Callbacks run here, on the caller's thread, so they may touch the
+            # UI; an exception they raise (e.g. a Streamlit rerun) ends the run.
+            if on_progress:
+                on_progress(list(completed), time.monotonic() - started)
+            if main in done:
+                return main.result()
+    finally:
+        if not main.done():
+            main.cancel()
+            await asyncio.gather(main, return_exceptions=True)
+
+
+def run_pipeline(inputs, predict, plan_meals, executor=None, on_progress=None, poll_interval=0.25):
+    # inputs: files, manual_text, manual_numeric, diabetes, total_cholesterol,
+    # diet_type. Blocking stages already started in the executor cannot be
+    # interrupted; if on_progress raises, their results are simply dropped.
+    return asyncio.run(
+        _supervise(inputs, predict, plan_meals, executor, on_progress, poll_interval)
+    )
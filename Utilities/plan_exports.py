@@ -0,0 +1,65 @@
+import csv
+import hashlib
+import io
+import json
+from datetime import date, datetime, timedelta, timezone
+
+MEALS = ["breakfast", "lunch", "snack", "dinner"]
+
+
+def plan_json(diet, plan):
+    payload = {"diet": diet, "weekly_meal_plan": plan}
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def plan_csv(plan):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(["day"] + MEALS)
+    for i, day in enumerate(plan, start=1):
+        writer.writerow([i] + [day[m] for m in MEALS])
+    return buf.getvalue().encode("utf-8")
+
+
+def _ics_escape(value):
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _ics_fold(line):
+    # RFC 5545: lines longer than 75 octets continue on lines starting with a space.
+    raw = line.encode("utf-8")
+    parts = []
+    while len(raw) > 75:
+        cut = 75 if not parts else 74
+        while (raw[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(raw[:cut].decode("utf-8"))
+        raw = raw[cut:]
+    parts.append(raw.decode("utf-8"))
+    return "\r\n ".join(parts)
+
+
+def plan_ics(plan, start=None):
+    start = start or date.today()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    plan_id = hashlib.sha1(json.dumps(plan, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//MyDiet_AI//Meal Plan//EN",
+    ]
+    for i, day in enumerate(plan):
+        d = start + timedelta(days=i)
+        description = "\n".join(f"{m.title()}: {day[m]}" for m in MEALS)
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{plan_id}-day{i + 1}@mydiet-ai",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART;VALUE=DATE:{d:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{d + timedelta(days=1):%Y%m%d}",
+            f"SUMMARY:{_ics_escape(f'Meal plan - Day {i + 1}')}",
+            f"DESCRIPTION:{_ics_escape(description)}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(_ics_fold(l) for l in lines) + "\r\n").encode("utf-8")
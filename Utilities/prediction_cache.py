@@ -0,0 +1,102 @@
+import math
+import threading
+from collections import OrderedDict
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+
+FEATURES = ["age", "glucose", "cholesterol", "blood_pressure", "bmi"]
+
+# Feature values are rounded to the nearest multiple of their step before
+# lookup, so e.g. BMI 24.01 and 24.04 share an entry. Midpoints always round
+# up (glucose 100.5 -> 101, BMI 24.05 -> 24.1).
+DEFAULT_STEPS = {
+    "age": 1.0,
+    "glucose": 1.0,
+    "cholesterol": 1.0,
+    "blood_pressure": 1.0,
+    "bmi": 0.1,
+}
+
+
+class PredictionCache:
+    def __init__(self, model_path, maxsize=4096, steps=None):
+        self.model_path = Path(model_path)
+        self.maxsize = maxsize
+        self.steps = dict(DEFAULT_STEPS, **(steps or {}))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _model_stamp(self):
+        try:
+            stat = self.model_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def key(self, numeric_data):
+        values = []
+        for f in FEATURES:
+            raw = numeric_data[f]
+            if not math.isfinite(float(raw)):
+                return None
+            # str() gives the shortest repr (also for numpy float32 values from
+            # CSVs), so Decimal sees 24.05 rather than its binary approximation;
+            # ROUND_HALF_UP avoids round()'s banker's rounding.
+            bucket = Decimal(str(raw)) / Decimal(str(self.steps[f]))
+            values.append(int(bucket.quantize(Decimal(1), rounding=ROUND_HALF_UP)))
+        return tuple(values)
+
+    def _sync_model_version(self, stamp):
+        if stamp != self._model_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._model_version = stamp
+
+    def get_or_compute(self, numeric_data, compute):
+        key = self.key(numeric_data)
+        if key is None:
+            return compute(numeric_data)
+
+        stamp = self._model_stamp()
+        with self._lock:
+            self._sync_model_version(stamp)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Inference runs outside the lock so concurrent misses don't serialize.
+        value = compute(numeric_data)
+
+        with self._lock:
+            if stamp == self._model_version:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,51 @@
+import threading
+from pathlib import Path
+
+# Populated by preload() in the pre-fork parent. Forked workers inherit these
+# objects copy-on-write instead of loading their own copies.
+MODEL = None
+MODEL_STAMP = None
+NLP = None
+
+_model_lock = threading.Lock()
+
+
+def _stamp(model_path):
+    stat = Path(model_path).stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def build_nlp():
+    import spacy
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    return nlp
+
+
+def preload(model_path):
+    global MODEL, MODEL_STAMP, NLP
+    import joblib
+    import lightgbm  # noqa: F401
+    import pandas  # noqa: F401
+    MODEL = joblib.load(str(model_path))
+    MODEL_STAMP = _stamp(model_path)
+    NLP = build_nlp()
+
+
+def get_model(model_path):
+    # Without the pre-fork launcher the first call loads the model and keeps
+    # it here too; it is reloaded only when the file on disk changes.
+    global MODEL, MODEL_STAMP
+    stamp = _stamp(model_path)
+    if MODEL is not None and MODEL_STAMP == stamp:
+        return MODEL
+    with _model_lock:
+        if MODEL is None or MODEL_STAMP != stamp:
+            import joblib
+            MODEL = joblib.load(str(model_path))
+            MODEL_STAMP = stamp
+        return MODEL
+
+
+def get_nlp():
+    return NLP if NLP is not None else build_nlp()
@@ -0,0 +1,93 @@
+from functools import lru_cache
+from html import escape
+from operator import itemgetter
+
+# The report is built from f-strings with every interpolated value escaped.
+# Lines carry no indentation and no blank lines, so Markdown keeps the whole
+# report as a single HTML block.
+MEALS = ("breakfast", "lunch", "snack", "dinner")
+_meal_values = itemgetter(*MEALS)
+
+
+# Dish and food names come from a small fixed menu, so their escaped form is
+# memoized; after the first few runs escaping is a dictionary hit.
+@lru_cache(maxsize=4096)
+def _escape(value):
+    return escape(value)
+
+
+def _items(values):
+    return "".join([f"<li>{_escape(str(v))}</li>" for v in values])
+
+
+# The four meal cells of a day depend only on the dishes, and the menus are
+# small, so each combination is formatted once and reused across plans.
+@lru_cache(maxsize=1024)
+def _meals(breakfast, lunch, snack, dinner):
+    return f"""<div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem;">
+<div style="background: #f8f9fa; padding: 10px; border-radius: 8px;"><strong>🍳 Breakfast</strong><br><span style="color: #555;">{_escape(breakfast)}</span></div>
+<div style="background: #f8f9fa; padding: 10px; border-radius: 8px;"><strong>🍱 Lunch</strong><br><span style="color: #555;">{_escape(lunch)}</span></div>
+<div style="background: #f8f9fa; padding: 10px; border-radius: 8px;"><strong>🍎 Snack</strong><br><span style="color: #555;">{_escape(snack)}</span></div>
+<div style="background: #f8f9fa; padding: 10px; border-radius: 8px;"><strong>🍽️ Dinner</strong><br><span style="color: #555;">{_escape(dinner)}</span></div>
+</div>"""
+
+
+DAY_OPEN = """<div class="result-card" style="border-left: 5px solid #FF416C; margin-bottom: 20px;">
+<h4 style="color: #2c3e50; margin-bottom: 1rem;">📅 Day {}</h4>
+"""
+DAY_CLOSE = "\n</div>"
+
+
+@lru_cache(maxsize=32)
+def _day_open(i):
+    return DAY_OPEN.format(i) if i == 1 else "\n" + DAY_OPEN.format(i)
+
+
+# The analysis, food lists and advice come from a handful of keyword rules, so
+# the top of the report repeats across patients and is formatted once.
+@lru_cache(maxsize=256)
+def _head(condition, allowed, restricted, diet_plan, lifestyle_advice, ml_pred, ml_source):
+    ml_line = ""
+    if ml_pred:
+        ml_line = f'<p><strong>ML Risk Assessment:</strong> <span style="color: #e67e22; font-weight: bold;">{_escape(ml_pred)}</span> <small>({_escape(ml_source)})</small></p>'
+    return f"""<hr>
+<h2>🥗 Your Personalized Nutrition Plan</h2>
+<div class="result-card">
+<h3>🩺 Health Analysis</h3>
+<p><strong>Detected Condition:</strong> <span style="color: #e74c3c; font-weight: bold;">{_escape(condition)}</span></p>{ml_line}
+</div>
+<div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem;">
+<div class="result-card" style="border-left: 5px solid #2ecc71;">
+<h3 style="color: #2ecc71;">✅ Foods to Include</h3>
+<ul style="padding-left: 20px;">{_items(allowed)}</ul>
+</div>
+<div class="result-card" style="border-left: 5px solid #e74c3c;">
+<h3 style="color: #e74c3c;">❌ Foods to Avoid</h3>
+<ul style="padding-left: 20px;">{_items(restricted)}</ul>
+</div>
+</div>
+<div class="result-card" style="border-left: 5px solid #3498db;">
+<h3 style="color: #3498db;">💡 Lifestyle & Diet Advice</h3>
+<p><strong>Diet Strategy:</strong> {_escape(diet_plan)}</p>
+<p><strong>Daily Habits:</strong> {_escape(lifestyle_advice)}</p>
+</div>
+<h2>📅 7-Day Meal Schedule</h2>
+"""
+
+
+def render_report(diet, plan, ml_pred=None, ml_source=None):
+    head = _head(
+        diet["condition"],
+        tuple(diet["allowed_foods"]),
+        tuple(diet["restricted_foods"]),
+        diet["diet_plan"],
+        diet["lifestyle_advice"],
+        str(ml_pred) if ml_pred else "",
+        str(ml_source or ""),
+    )
+    # One join over all the pieces, so the large page is copied only once.
+    parts = [head]
+    for i, day in enumerate(plan, start=1):
+        parts += (_day_open(i), _meals(*_meal_values(day)), DAY_CLOSE)
+    return "".join(parts)
+
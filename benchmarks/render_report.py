@@ -0,0 +1,128 @@
+# Compares the old per-card st.markdown rendering of the results section with
+# the single escaped render. Run from the repo root:
+#     python benchmarks/render_report.py
+# "payload" is the markdown body sent to the browser; each delta also carries
+# its own protobuf/websocket framing on top, which favours fewer deltas further.
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Utilities import report_renderer
+from Utilities.report_renderer import render_report
+
+DIET = {
+    "condition": "Diabetes, High Cholesterol",
+    "allowed_foods": ["vegetables", "whole grains", "fruits"],
+    "restricted_foods": ["sugar", "oily food"],
+    "diet_plan": "Follow a diabetic-friendly low sugar diet. Increase fiber intake and avoid fried foods.",
+    "lifestyle_advice": "Walk daily for 30 minutes.",
+}
+PLAN = [
+    {
+        "breakfast": "Besan chilla with mint chutney",
+        "lunch": "Roti, dal, mixed veg (low oil)",
+        "snack": "Sprouts salad",
+        "dinner": "Dal, roti, sautéed greens",
+    }
+] * 7
+ML_PRED, ML_SOURCE = "Abnormal", "ML model"
+
+
+def legacy_render(diet, mp, ml_pred, ml_source):
+    # Body of every st.markdown call the results section made before the
+    # template, copied from the previous Main_App.py.
+    calls = ["---", "## 🥗 Your Personalized Nutrition Plan"]
+    calls.append(f"""
+    <div class="result-card">
+        <h3>🩺 Health Analysis</h3>
+        <p><strong>Detected Condition:</strong> <span style="color: #e74c3c; font-weight: bold;">{diet['condition']}</span></p>
+        {f'<p><strong>ML Risk Assessment:</strong> <span style="color: #e67e22; font-weight: bold;">{ml_pred}</span> <small>({ml_source})</small></p>' if ml_pred else ''}
+    </div>
+    """)
+    items = "".join([f"<li>{x}</li>" for x in diet["allowed_foods"]])
+    calls.append(f"""
+        <div class="result-card" style="border-left: 5px solid #2ecc71;">
+            <h3 style="color: #2ecc71;">✅ Foods to Include</h3>
+            <ul style="padding-left: 20px;">{items}</ul>
+        </div>
+        """)
+    items = "".join([f"<li>{x}</li>" for x in diet["restricted_foods"]])
+    calls.append(f"""
+        <div class="result-card" style="border-left: 5px solid #e74c3c;">
+            <h3 style="color: #e74c3c;">❌ Foods to Avoid</h3>
+            <ul style="padding-left: 20px;">{items}</ul>
+        </div>
+        """)
+    calls.append(f"""
+    <div class="result-card" style="border-left: 5px solid #3498db;">
+        <h3 style="color: #3498db;">💡 Lifestyle & Diet Advice</h3>
+        <p><strong>Diet Strategy:</strong> {diet['diet_plan']}</p>
+        <p><strong>Daily Habits:</strong> {diet['lifestyle_advice']}</p>
+    </div>
+    """)
+    calls.append("## 📅 7-Day Meal Schedule")
+    for idx, day in enumerate(mp, start=1):
+        calls.append(f"""
+        <div class="result-card" style="border-left: 5px solid #FF416C; margin-bottom: 20px;">
+            <h4 style="color: #2c3e50; margin-bottom: 1rem;">📅 Day {idx}</h4>
+            <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem;">
+                <div style="background: #f8f9fa; padding: 10px; border-radius: 8px;">
+                    <strong>🍳 Breakfast</strong><br>
+                    <span style="color: #555;">{day['breakfast']}</span>
+                </div>
+                <div style="background: #f8f9fa; padding: 10px; border-radius: 8px;">
+                    <strong>🍱 Lunch</strong><br>
+                    <span style="color: #555;">{day['lunch']}</span>
+                </div>
+                <div style="background: #f8f9fa; padding: 10px; border-radius: 8px;">
+                    <strong>🍎 Snack</strong><br>
+                    <span style="color: #555;">{day['snack']}</span>
+                </div>
+                <div style="background: #f8f9fa; padding: 10px; border-radius: 8px;">
+                    <strong>🍽️ Dinner</strong><br>
+                    <span style="color: #555;">{day['dinner']}</span>
+                </div>
+            </div>
+        </div>
+        """)
+    return calls
+
+
+def render_cold():
+    # Nothing memoized yet, as in a freshly started process.
+    report_renderer._head.cache_clear()
+    report_renderer._day_open.cache_clear()
+    report_renderer._meals.cache_clear()
+    report_renderer._escape.cache_clear()
+    return render_report(DIET, PLAN, ML_PRED, ML_SOURCE)
+
+
+def measure(name, fn, deltas):
+    number = 2000
+    seconds = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    out = fn()
+    bodies = out if isinstance(out, list) else [out]
+    payload = sum(len(b.encode("utf-8")) for b in bodies)
+    print(f"{name:<10} {len(bodies):>6} {deltas:>7} {payload:>10,} B {seconds * 1e6:>9.1f} us")
+    return payload, seconds
+
+
+def main():
+    print(f"{'path':<10} {'calls':>6} {'deltas':>7} {'payload':>12} {'render':>12}")
+    # Legacy: 14 st.markdown calls plus st.columns (one block and two columns).
+    old = measure("legacy", lambda: legacy_render(DIET, PLAN, ML_PRED, ML_SOURCE), 17)
+    # Steady state: the menus and diet rules are fixed, so the report head,
+    # dish escapes and meal cells are memoized after the first few runs.
+    new = measure("template", lambda: render_report(DIET, PLAN, ML_PRED, ML_SOURCE), 1)
+    cold = measure("cold", render_cold, 1)
+    print(f"payload -{1 - new[0] / old[0]:.0%}, render time {new[1] / old[1]:.2f}x of legacy "
+          f"({cold[1] / old[1]:.2f}x cold)")
+    # Reruns of the same result (e.g. from the download controls) resend the
+    # HTML stored with it and render nothing; the old path re-rendered all 14
+    # calls on every rerun that kept the results visible.
+
+
+if __name__ == "__main__":
+    main()
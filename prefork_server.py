@@ -0,0 +1,179 @@
+import argparse
+import gc
+import os
+import signal
+import sys
+import time
+import traceback
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+
+from Utilities import preload
+
+MODEL_PATH = ROOT / "ML_model" / "ML_model.pkl"
+APP_PATH = ROOT / "Main_App.py"
+
+# A worker that exits sooner than this after starting counts as a crash.
+# Crashing workers are restarted with exponential backoff, up to a limit.
+MIN_UPTIME_S = 10.0
+MAX_BACKOFF_S = 60.0
+
+
+# -------------------- MEMORY REPORTING --------------------
+def memory_usage(pid):
+    # Returns (rss_kb, pss_kb); PSS splits shared pages across the processes
+    # mapping them, so it shows what each worker really costs.
+    rss = pss = None
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Rss:"):
+                    rss = int(line.split()[1])
+                elif line.startswith("Pss:"):
+                    pss = int(line.split()[1])
+    except OSError:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        rss = int(line.split()[1])
+        except OSError:
+            pass
+    return rss, pss
+
+
+def fmt_mb(kb):
+    return "n/a" if kb is None else f"{kb / 1024:.1f} MB"
+
+
+def report(workers):
+    total_rss = total_pss = 0
+    lines = [f"{'pid':>8} {'port':>6} {'rss':>12} {'pss':>12}"]
+    for pid, port in sorted(workers.items(), key=lambda w: w[1]):
+        rss, pss = memory_usage(pid)
+        total_rss += rss or 0
+        total_pss += pss or 0
+        lines.append(f"{pid:>8} {port:>6} {fmt_mb(rss):>12} {fmt_mb(pss):>12}")
+    lines.append(f"{'total':>8} {'':>6} {fmt_mb(total_rss):>12} {fmt_mb(total_pss):>12}")
+    print("\n".join(lines), flush=True)
+
+
+# -------------------- WORKERS --------------------
+def run_worker(port):
+    from streamlit.web import cli as stcli
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    sys.argv = [
+        "streamlit", "run", str(APP_PATH),
+        "--server.port", str(port),
+        "--server.headless", "true",
+    ]
+    code = 1
+    try:
+        stcli.main()
+        code = 0
+    except SystemExit as exc:
+        code = exc.code if isinstance(exc.code, int) else 1
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+
+def spawn(port):
+    pid = os.fork()
+    if pid == 0:
+        run_worker(port)
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run MyDiet_AI as pre-forked Streamlit workers.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--port", type=int, default=8501, help="port of the first worker; others follow")
+    parser.add_argument("--report-interval", type=float, default=60.0, help="seconds between memory reports")
+    parser.add_argument("--max-restarts", type=int, default=5, help="consecutive crashes before a port is given up")
+    args = parser.parse_args()
+
+    # Import and load everything heavy once, before forking.
+    preload.preload(MODEL_PATH)
+    import streamlit.web.cli  # noqa: F401
+    import pdfplumber  # noqa: F401
+    gc.collect()
+    # Keep the collector from touching (and so copying) the preloaded objects.
+    gc.freeze()
+
+    workers = {}
+    started = {}
+    crashes = {}
+    pending = {}
+
+    def start(port):
+        workers[spawn(port)] = port
+        started[port] = time.monotonic()
+
+    for i in range(args.workers):
+        port = args.port + i
+        crashes[port] = 0
+        start(port)
+    print(f"Started {len(workers)} workers on ports {args.port}-{args.port + args.workers - 1}", flush=True)
+
+    def shutdown(signum, frame):
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in workers:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    next_report = time.monotonic() + args.report_interval
+    while True:
+        time.sleep(1)
+        now = time.monotonic()
+        # Replace any worker that died; the new one forks from the same
+        # preloaded parent, so it shares the same pages.
+        for pid, port in list(workers.items()):
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if not done:
+                continue
+            del workers[pid]
+            code = os.waitstatus_to_exitcode(status)
+            uptime = now - started[port]
+            crashes[port] = crashes[port] + 1 if uptime < MIN_UPTIME_S else 0
+            if crashes[port] >= args.max_restarts:
+                print(f"Worker {pid} on port {port} exited with status {code} after {uptime:.1f}s; "
+                      f"giving up after {crashes[port]} consecutive crashes", flush=True)
+                continue
+            delay = min(MAX_BACKOFF_S, 2.0 ** crashes[port]) if crashes[port] else 0.0
+            print(f"Worker {pid} on port {port} exited with status {code} after {uptime:.1f}s; "
+                  f"restarting in {delay:.0f}s", flush=True)
+            pending[port] = now + delay
+
+        for port, due in list(pending.items()):
+            if now >= due:
+                del pending[port]
+                start(port)
+
+        if not workers and not pending:
+            print("No workers left running; exiting", flush=True)
+            sys.exit(1)
+
+        if time.monotonic() >= next_report:
+            report(workers)
+            next_report = time.monotonic() + args.report_interval
+
+
+if __name__ == "__main__":
+    main()